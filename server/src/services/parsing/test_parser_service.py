@@ -0,0 +1,94 @@
+"""
+Tests for the document parser service
+
+Usage: pytest test_parser_service.py
+"""
+
+import asyncio
+import base64
+import os
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import parser_service
+
+
+def test_batch_duplicate_failing_items_report_parse_error(monkeypatch):
+    """Duplicates of a failing document each get the real parse error."""
+    async def failing_parser(*args, **kwargs):
+        await asyncio.sleep(0.01)  # keep the duplicates in flight together
+        raise ValueError("parse failed")
+
+    monkeypatch.setattr(parser_service, "run_parser", failing_parser)
+    item = {"fileContent": base64.b64encode(b"# Title\n\nText").decode(), "filename": "doc.md"}
+
+    with TestClient(parser_service.app) as client:
+        response = client.post("/parse-batch", json=[item, item, item])
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["success"] for r in results] == [False, False, False]
+    assert [r["error"] for r in results] == ["parse failed"] * 3
+    assert parser_service.parse_cache.inflight == {}
+
+
+def test_html_full_text_keeps_text_outside_block_tags():
+    """Text in divs, spans and blockquotes only survives in fullText."""
+    html = (
+        "<html><head><title>Page</title></head><body>"
+        "<h1>Heading</h1><div>Div content here</div>"
+        "<blockquote>Quoted text</blockquote><p>Para with <span>span text</span></p>"
+        "</body></html>"
+    )
+
+    document = parser_service.parse_html_content(html, "page.html", "doc_1_abc")
+
+    assert document.metadata.title == "Page"
+    assert [b.type for b in document.blocks] == ["heading", "paragraph"]
+    for text in ("Div content here", "Quoted text", "span text"):
+        assert text in document.fullText
+
+
+def test_cached_document_gets_request_filename_and_document_id(monkeypatch):
+    """Same bytes under another name are served from cache with their own identity."""
+    content = base64.b64encode(b"# Title\n\nShared text").decode()
+
+    with TestClient(parser_service.app) as client:
+        first = client.post("/parse", json={"fileContent": content, "filename": "first.md"}).json()
+
+        # Cache hits are served from the stored JSON without validating it again
+        def no_validation(*args, **kwargs):
+            raise AssertionError("cached document was validated")
+
+        monkeypatch.setattr(parser_service.ParsedDocument, "model_validate_json", no_validation)
+        second = client.post("/parse", json={"fileContent": content, "filename": "second.md"}).json()
+
+    assert first["document"]["metadata"]["filename"] == "first.md"
+    assert second["document"]["metadata"]["filename"] == "second.md"
+    assert first["document"]["documentId"] != second["document"]["documentId"]
+    assert second["document"]["blocks"] == first["document"]["blocks"]
+    assert second["success"] is True
+
+
+def test_etag_depends_on_parse_options():
+    content = base64.b64encode(b"# Title\n\nSame bytes").decode()
+
+    with TestClient(parser_service.app) as client:
+        def etag(**options):
+            return client.post("/parse", json={"fileContent": content, "filename": "doc.md", "options": options}).headers["ETag"]
+
+        default = etag()
+        assert etag() == default
+        assert etag(maxPages=1) != default
+
+def test_spool_falls_back_to_default_temp_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(parser_service, "spool_dir", lambda size: str(tmp_path / "missing"))
+
+    path = parser_service.spool_bytes(b"%PDF-1.4", ".pdf")
+    try:
+        assert os.path.dirname(path) == tempfile.gettempdir()
+        with open(path, "rb") as f:
+            assert f.read() == b"%PDF-1.4"
+    finally:
+        os.unlink(path)
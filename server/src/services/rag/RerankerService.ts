@@ -37,7 +37,7 @@ interface RerankApiResponse {
   results: Array<{
     index: number;
     score: number;
-    document: string;
+    document?: string | null;
   }>;
   processing_time_ms: number;
   model: string;
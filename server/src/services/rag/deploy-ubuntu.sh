@@ -12,7 +12,7 @@ echo "📦 Deploying Reranker Service to $UBUNTU_HOST..."
 ssh $UBUNTU_USER@$UBUNTU_HOST "sudo mkdir -p $REMOTE_DIR && sudo chown $UBUNTU_USER:$UBUNTU_USER $REMOTE_DIR"
 
 # Copy Python files
-scp reranker_service.py requirements.txt $UBUNTU_USER@$UBUNTU_HOST:$REMOTE_DIR/
+scp reranker_service.py export_reranker.py requirements.txt $UBUNTU_USER@$UBUNTU_HOST:$REMOTE_DIR/
 
 # Copy systemd service file
 scp reranker.service $UBUNTU_USER@$UBUNTU_HOST:/tmp/
@@ -32,6 +32,15 @@ fi
 source venv/bin/activate
 pip install -q -r requirements.txt
 
+# Export the ONNX model variants - again whenever RERANKER_MODEL changes
+RERANKER_MODEL=$(sed -n 's/^Environment="RERANKER_MODEL=\(.*\)"$/\1/p' /etc/systemd/system/reranker.service)
+RERANKER_MODEL=${RERANKER_MODEL:-BAAI/bge-reranker-v2-m3}
+if [ "$(cat model/source_model.txt 2>/dev/null)" != "$RERANKER_MODEL" ]; then
+    echo "Exporting ONNX model ($RERANKER_MODEL)..."
+    rm -rf model
+    RERANKER_MODEL="$RERANKER_MODEL" RERANKER_MODEL_DIR=model python export_reranker.py
+fi
+
 # Enable and start service
 sudo systemctl daemon-reload
 sudo systemctl enable reranker
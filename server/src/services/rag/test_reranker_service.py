@@ -0,0 +1,147 @@
+"""
+Tests for the reranker service
+
+Builds a tiny randomly initialised BERT cross-encoder on disk, so no model
+download is needed. Usage: pytest test_reranker_service.py
+"""
+
+import os
+import asyncio
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+# Read at import time - eager fp32 on CPU keeps the test fast and deterministic
+# (int8 dynamic quantization scales activations per batch, so scores would
+# depend on which pairs share a batch)
+os.environ["RERANKER_BACKEND"] = "torch"
+os.environ["RERANKER_DEVICE"] = "cpu"
+os.environ["RERANKER_COMPILE"] = "0"
+os.environ["RERANKER_QUANTIZE"] = "0"
+os.environ["RERANKER_BUCKETS"] = "16,32,64"
+
+import numpy as np
+from fastapi.testclient import TestClient
+from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+from transformers import BertConfig, BertForSequenceClassification, PreTrainedTokenizerFast
+
+import reranker_service
+
+WORDS = ["the", "a", "cat", "dog", "sat", "on", "mat", "ran", "far", "away", "query", "document", "what", "where"]
+
+QUERY = "where the cat sat"
+DOCUMENTS = [
+    "the cat sat on the mat",
+    "a dog",
+    "the dog ran far away from the cat and the mat " * 3,
+    "what",
+    "the mat sat on a cat far away",
+    "a document on a query",
+]
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    model_dir = tmp_path_factory.mktemp("tiny-cross-encoder")
+    vocab = {token: i for i, token in enumerate(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS)}
+    backend = Tokenizer(models.WordPiece(vocab, unk_token="[UNK]"))
+    backend.normalizer = normalizers.BertNormalizer()
+    backend.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    backend.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        pair="[CLS] $A [SEP] $B:1 [SEP]:1",
+        special_tokens=[("[CLS]", vocab["[CLS]"]), ("[SEP]", vocab["[SEP]"])],
+    )
+    PreTrainedTokenizerFast(
+        tokenizer_object=backend,
+        unk_token="[UNK]", pad_token="[PAD]", cls_token="[CLS]", sep_token="[SEP]", mask_token="[MASK]",
+    ).save_pretrained(model_dir)
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=5 + len(WORDS),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=128,
+        num_labels=1,
+        # Wide init so the random model's scores actually differ per pair
+        initializer_range=1.0,
+    )
+    BertForSequenceClassification(config).save_pretrained(model_dir)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(reranker_service, "MODEL_NAME", str(model_dir))
+        # One module-wide startup - torch only accepts set_num_interop_threads once
+        with TestClient(reranker_service.app) as test_client:
+            reranker_service.model.max_length = 64
+            yield test_client
+
+
+def predict(query, documents):
+    return reranker_service.model.predict([[query, doc] for doc in documents])
+
+
+@pytest.mark.parametrize("buckets", [[], [16, 32, 64]])
+def test_score_batch_matches_predict(client, monkeypatch, buckets):
+    monkeypatch.setattr(reranker_service, "BUCKETS", buckets)
+    # Several batches, so pairs are reordered by length across them
+    monkeypatch.setattr(reranker_service, "BATCH_SIZE", 2)
+
+    other_query = "what a dog"
+    scores, other_scores = reranker_service.score_batch([(QUERY, DOCUMENTS), (other_query, DOCUMENTS[:3])])
+
+    np.testing.assert_allclose(scores, predict(QUERY, DOCUMENTS), atol=1e-5)
+    np.testing.assert_allclose(other_scores, predict(other_query, DOCUMENTS[:3]), atol=1e-5)
+
+
+def test_batcher_coalesces_concurrent_jobs(client, monkeypatch):
+    runs = []
+    score_batch = reranker_service.score_batch
+
+    def recording_score_batch(jobs):
+        runs.append(len(jobs))
+        return score_batch(jobs)
+
+    monkeypatch.setattr(reranker_service, "score_batch", recording_score_batch)
+
+    async def score_concurrently():
+        return await asyncio.gather(*(reranker_service.score_with_model(QUERY, [doc]) for doc in DOCUMENTS))
+
+    results = client.portal.call(score_concurrently)
+
+    assert sum(runs) == len(DOCUMENTS)
+    assert len(runs) < len(DOCUMENTS)
+    np.testing.assert_allclose(np.concatenate(results), predict(QUERY, DOCUMENTS), atol=1e-5)
+
+
+def test_rerank_serves_repeated_pairs_from_cache(client, monkeypatch):
+    reranker_service.score_cache.entries.clear()
+    response = client.post("/rerank", json={"query": QUERY, "documents": DOCUMENTS, "top_k": len(DOCUMENTS)})
+    assert response.status_code == 200
+    first = {r["index"]: r["score"] for r in response.json()["results"]}
+    np.testing.assert_allclose([first[i] for i in range(len(DOCUMENTS))], predict(QUERY, DOCUMENTS), atol=1e-5)
+    assert len(reranker_service.score_cache.entries) == len(DOCUMENTS)
+
+    def fail(jobs):
+        raise AssertionError("cached pairs were scored again")
+
+    monkeypatch.setattr(reranker_service, "score_batch", fail)
+    response = client.post("/rerank", json={"query": QUERY, "documents": DOCUMENTS, "top_k": len(DOCUMENTS)})
+    assert response.status_code == 200
+    assert {r["index"]: r["score"] for r in response.json()["results"]} == pytest.approx(first)
+
+
+def test_score_cache_evicts_least_recently_used():
+    cache = reranker_service.ScoreCache(2)
+    cache.set(b"a", 0.1)
+    cache.set(b"b", 0.2)
+    assert cache.get(b"a") == 0.1
+    cache.set(b"c", 0.3)
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == 0.1
+    assert cache.get(b"c") == 0.3
@@ -8,18 +8,35 @@ Usage: uvicorn parser_service:app --host 0.0.0.0 --port 8002
 
 import os
 import io
+import re
 import time
 import base64
+import shutil
+import asyncio
 import hashlib
+import inspect
 import tempfile
-from typing import List, Optional, Dict, Any
+import multiprocessing
+from typing import List, Optional, Dict, Any, Callable, Awaitable, Tuple, Union
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
+from cachetools import LRUCache
+import orjson
 import markdown
 
+# Redis (optional second cache tier)
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 # Docling imports
 try:
     from docling.document_converter import DocumentConverter, PdfFormatOption
@@ -31,12 +48,81 @@ except ImportError:
     DOCLING_AVAILABLE = False
     print("Warning: Docling not available. Install with: pip install docling")
 
+# BeautifulSoup for native HTML parsing
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+# Fastest available BeautifulSoup tree builder (libxml2 C parser)
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# BLAKE3 (optional - SIMD-accelerated content hashing)
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Threaded PDF pipeline (parallel page processing, newer Docling releases)
+try:
+    from docling.datamodel.pipeline_options import ThreadedPdfPipelineOptions
+    from docling.pipeline.threaded_standard_pdf_pipeline import ThreadedStandardPdfPipeline
+    DOCLING_THREADED_AVAILABLE = True
+except ImportError:
+    DOCLING_THREADED_AVAILABLE = False
+
+# convert(page_range=...) only exists in newer Docling releases
+DOCLING_PAGE_RANGE_AVAILABLE = (
+    DOCLING_AVAILABLE and 'page_range' in inspect.signature(DocumentConverter.convert).parameters
+)
+
 # Configuration
 SUPPORTED_FORMATS = ['pdf', 'docx', 'pptx', 'xlsx', 'html', 'md', 'txt']
 MAX_FILE_SIZE = 150 * 1024 * 1024  # 150MB
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1MB read size for streamed uploads
+# Spool directory for Docling input files - tmpfs keeps them off the disk
+PARSER_TMP_DIR = os.getenv("PARSER_TMP_DIR") or ('/dev/shm' if os.path.isdir('/dev/shm') else None)
+PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", os.cpu_count() or 1))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+NATIVE_PARSER_THREADS = int(os.getenv("NATIVE_PARSER_THREADS", min(32, (os.cpu_count() or 1) * 4)))
+DOCLING_THREADS = int(os.getenv("DOCLING_THREADS", "4"))
+DOCLING_QUEUE_SIZE = int(os.getenv("DOCLING_QUEUE_SIZE", "32"))  # Pages in flight per stage
+PARSER_CACHE_TTL = int(os.getenv("PARSER_CACHE_TTL", "86400"))  # 24h
+PARSER_CACHE_MB = int(os.getenv("PARSER_CACHE_MB", "256"))  # In-process cache budget
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Markdown block classifier: heading | code fence | list item ('-', '*', '+' or '1.')
+MD_BLOCK_RE = re.compile(
+    r'^(?P<h>#{1,6})(?:[ \t]+(?P<ht>.*))?$'
+    r'|^```(?P<lang>.*)$'
+    r'|^[ \t]*(?P<marker>[-*+]|\d{1,2}\.)[ \t]+(?P<item>\S.*)$',
+    re.M
+)
+PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+# Plain text paragraph: a run of non-empty lines (i.e. text between '\n\n' breaks)
+TXT_PARAGRAPH_RE = re.compile(r'[^\n]+(?:\n[^\n]+)*')
 
-# Global converter instance
-converter: Optional[DocumentConverter] = None
+# HTML elements turned into content blocks
+HTML_BLOCK_TAGS = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'table', 'pre', 'code', 'ul', 'ol'))
+
+# Converter instance - only set inside Docling pool workers (one per process)
+converter: Optional['DocumentConverter'] = None
+
+# Process pool for CPU-bound Docling conversions
+docling_pool: Optional[ProcessPoolExecutor] = None
+docling_semaphore: Optional[asyncio.Semaphore] = None
+
+# Thread pool for the lightweight native MD/TXT/HTML parsers
+native_executor: Optional[ThreadPoolExecutor] = None
+
+# Parsed document cache (created on startup)
+parse_cache: Optional['ParseCache'] = None
 
 
 # ============================================
@@ -155,6 +241,9 @@ class HealthResponse(BaseModel):
 # ============================================
 # Parser Implementation
 # ============================================
+# Parsers build blocks/cells/outline items with model_construct(): the values
+# come from our own code, and validating thousands of blocks per document
+# dominated parse time for large files.
 
 def get_format_from_filename(filename: str) -> Optional[str]:
     """Detect format from filename extension."""
@@ -173,15 +262,131 @@ def get_format_from_filename(filename: str) -> Optional[str]:
     return ext_map.get(ext)
 
 
-def generate_document_id(content: bytes, filename: str) -> str:
-    """Generate unique document ID from content hash."""
-    hasher = hashlib.sha256()
-    hasher.update(content)
+def cpu_has_sha_extensions() -> bool:
+    """Check whether hashlib's SHA-256 runs on hardware SHA instructions."""
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith(('flags', 'Features')):
+                    flags = line.split()
+                    return 'sha_ni' in flags or 'sha2' in flags
+    except OSError:
+        pass
+    return False
+
+
+# BLAKE3 beats software SHA-256 by an order of magnitude; SHA-NI closes the gap
+USE_BLAKE3 = BLAKE3_AVAILABLE and not cpu_has_sha_extensions()
+
+
+def new_content_hasher():
+    """Create the hasher used for document content (ids and cache keys)."""
+    if USE_BLAKE3:
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.sha256()
+
+
+def generate_document_id(digest: bytes, filename: str, ts: Optional[int] = None) -> str:
+    """
+    Generate unique document ID from the content digest.
+
+    The digest is the one computed once at request entry (also used for the
+    cache key and ETag), so the payload is never hashed a second time.
+    """
+    hasher = new_content_hasher()
+    hasher.update(digest)
     hasher.update(filename.encode())
-    return f"doc_{int(time.time())}_{hasher.hexdigest()[:12]}"
+    return f"doc_{int(time.time()) if ts is None else ts}_{hasher.hexdigest()[:12]}"
 
 
-def parse_markdown_content(content: str, filename: str) -> ParsedDocument:
+def file_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB")
+
+
+def spool_dir(size: Optional[int]) -> Optional[str]:
+    """Use PARSER_TMP_DIR (tmpfs) when it has room for the file, else the default temp dir."""
+    if PARSER_TMP_DIR and size is not None:
+        try:
+            if shutil.disk_usage(PARSER_TMP_DIR).free > 2 * size:
+                return PARSER_TMP_DIR
+        except OSError:
+            pass
+    return None
+
+
+def spool_bytes(file_content: bytes, suffix: str) -> str:
+    """
+    Write document bytes to a temp file for Docling and return its path.
+
+    The tmpfs free-space check can race with concurrent writers, so a failed
+    write there (ENOSPC) is retried in the default temp dir.
+    """
+    tmp_dir = spool_dir(len(file_content))
+    while True:
+        tmp_name = None
+        try:
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False, dir=tmp_dir) as tmp:
+                tmp_name = tmp.name
+                tmp.write(file_content)
+            return tmp_name
+        except OSError:
+            if tmp_name:
+                remove_file(tmp_name)
+            if tmp_dir is None:
+                raise
+            tmp_dir = None
+
+
+async def spool_upload(file: UploadFile, suffix: str):
+    """
+    Stream an upload to a temp file in chunks.
+
+    Each chunk is hashed and size-checked on the way through, so the payload
+    never exists as one bytes object. Returns (path, content hasher, size).
+    A failed write to tmpfs starts over in the default temp dir.
+    """
+    # Starlette has already received the multipart body, so the size is known
+    tmp_dir = spool_dir(file.size)
+    while True:
+        hasher = new_content_hasher()
+        size = 0
+        try:
+            tmp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False, dir=tmp_dir)
+        except OSError:
+            if tmp_dir is None:
+                raise
+            tmp_dir = None
+            continue
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise file_too_large()
+                hasher.update(chunk)
+                tmp.write(chunk)
+            tmp.close()
+            return tmp.name, hasher, size
+        except OSError:
+            tmp.close()
+            remove_file(tmp.name)
+            if tmp_dir is None:
+                raise
+            tmp_dir = None
+            await file.seek(0)
+        except BaseException:
+            tmp.close()
+            remove_file(tmp.name)
+            raise
+
+
+def remove_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def parse_markdown_content(content: str, filename: str, document_id: str) -> ParsedDocument:
     """Parse markdown content into structured blocks."""
     start_time = time.time()
     blocks: List[ContentBlock] = []
@@ -189,31 +394,38 @@ def parse_markdown_content(content: str, filename: str) -> ParsedDocument:
     warnings: List[ParsingWarning] = []
     outline: List[DocumentOutlineItem] = []
 
-    lines = content.split('\n')
-    current_paragraph = []
-
-    for line in lines:
-        # Heading detection
-        if line.startswith('#'):
-            # Flush current paragraph
-            if current_paragraph:
-                para_text = '\n'.join(current_paragraph).strip()
-                if para_text:
-                    blocks.append(ContentBlock(
-                        type='paragraph',
-                        content=para_text,
-                        position=position,
-                        pageNumber=1
-                    ))
-                    position += 1
-                current_paragraph = []
-
-            # Parse heading
-            level = len(line) - len(line.lstrip('#'))
-            level = min(level, 6)
-            heading_text = line.lstrip('#').strip()
+    def add_paragraph(para_start: int, para_end: int):
+        nonlocal position
+        para_text = content[para_start:para_end].strip()
+        if para_text:
+            blocks.append(ContentBlock.model_construct(
+                type='paragraph',
+                content=para_text,
+                position=position,
+                pageNumber=1
+            ))
+            position += 1
 
-            blocks.append(ContentBlock(
+    def add_paragraphs(start: int, end: int):
+        """Emit the paragraphs in content[start:end], slicing each one exactly once."""
+        para_start = start
+        for brk in PARAGRAPH_BREAK_RE.finditer(content, start, end):
+            add_paragraph(para_start, brk.start())
+            para_start = brk.end()
+        add_paragraph(para_start, end)
+
+    # Single regex pass - everything between structural lines is paragraph text
+    last_end = 0
+    for match in MD_BLOCK_RE.finditer(content):
+        add_paragraphs(last_end, match.start())
+        last_end = match.end()
+
+        # Heading
+        if match.group('h'):
+            level = len(match.group('h'))
+            heading_text = (match.group('ht') or '').strip()
+
+            blocks.append(ContentBlock.model_construct(
                 type='heading',
                 content=heading_text,
                 position=position,
@@ -221,7 +433,7 @@ def parse_markdown_content(content: str, filename: str) -> ParsedDocument:
                 pageNumber=1
             ))
 
-            outline.append(DocumentOutlineItem(
+            outline.append(DocumentOutlineItem.model_construct(
                 title=heading_text,
                 level=level,
                 position=position,
@@ -229,24 +441,10 @@ def parse_markdown_content(content: str, filename: str) -> ParsedDocument:
             ))
             position += 1
 
-        # Code block detection
-        elif line.startswith('```'):
-            # Flush current paragraph
-            if current_paragraph:
-                para_text = '\n'.join(current_paragraph).strip()
-                if para_text:
-                    blocks.append(ContentBlock(
-                        type='paragraph',
-                        content=para_text,
-                        position=position,
-                        pageNumber=1
-                    ))
-                    position += 1
-                current_paragraph = []
-
-            # Extract language hint
-            lang = line[3:].strip() or None
-            blocks.append(ContentBlock(
+        # Code block fence
+        elif match.group('lang') is not None:
+            lang = match.group('lang').strip() or None
+            blocks.append(ContentBlock.model_construct(
                 type='code',
                 content='',  # Will be filled when block ends
                 position=position,
@@ -255,25 +453,12 @@ def parse_markdown_content(content: str, filename: str) -> ParsedDocument:
             ))
             position += 1
 
-        # List detection
-        elif line.strip().startswith(('- ', '* ', '+ ')) or (line.strip() and line.strip()[0].isdigit() and '. ' in line[:4]):
-            # Flush current paragraph
-            if current_paragraph:
-                para_text = '\n'.join(current_paragraph).strip()
-                if para_text:
-                    blocks.append(ContentBlock(
-                        type='paragraph',
-                        content=para_text,
-                        position=position,
-                        pageNumber=1
-                    ))
-                    position += 1
-                current_paragraph = []
-
-            list_type = 'ordered' if line.strip()[0].isdigit() else 'unordered'
-            item_text = line.strip().lstrip('-*+0123456789. ').strip()
+        # List item
+        else:
+            item_text = match.group('item').strip()
+            list_type = 'unordered' if match.group('marker') in ('-', '*', '+') else 'ordered'
 
-            blocks.append(ContentBlock(
+            blocks.append(ContentBlock.model_construct(
                 type='list',
                 content=item_text,
                 position=position,
@@ -283,39 +468,13 @@ def parse_markdown_content(content: str, filename: str) -> ParsedDocument:
             ))
             position += 1
 
-        # Regular paragraph content
-        elif line.strip():
-            current_paragraph.append(line)
-
-        # Empty line - flush paragraph
-        else:
-            if current_paragraph:
-                para_text = '\n'.join(current_paragraph).strip()
-                if para_text:
-                    blocks.append(ContentBlock(
-                        type='paragraph',
-                        content=para_text,
-                        position=position,
-                        pageNumber=1
-                    ))
-                    position += 1
-                current_paragraph = []
-
-    # Flush remaining paragraph
-    if current_paragraph:
-        para_text = '\n'.join(current_paragraph).strip()
-        if para_text:
-            blocks.append(ContentBlock(
-                type='paragraph',
-                content=para_text,
-                position=position,
-                pageNumber=1
-            ))
+    # Flush remaining paragraph text
+    add_paragraphs(last_end, len(content))
 
     duration_ms = (time.time() - start_time) * 1000
 
     return ParsedDocument(
-        documentId=generate_document_id(content.encode(), filename),
+        documentId=document_id,
         metadata=DocumentParseMetadata(
             filename=filename,
             format='md',
@@ -332,19 +491,17 @@ def parse_markdown_content(content: str, filename: str) -> ParsedDocument:
     )
 
 
-def parse_txt_content(content: str, filename: str) -> ParsedDocument:
+def parse_txt_content(content: str, filename: str, document_id: str) -> ParsedDocument:
     """Parse plain text content into paragraphs."""
     start_time = time.time()
     blocks: List[ContentBlock] = []
     position = 0
 
-    # Split into paragraphs by double newlines
-    paragraphs = content.split('\n\n')
-
-    for para in paragraphs:
-        para_text = para.strip()
+    # Stream paragraphs (separated by double newlines) without splitting into a list
+    for match in TXT_PARAGRAPH_RE.finditer(content):
+        para_text = match.group().strip()
         if para_text:
-            blocks.append(ContentBlock(
+            blocks.append(ContentBlock.model_construct(
                 type='paragraph',
                 content=para_text,
                 position=position,
@@ -355,7 +512,7 @@ def parse_txt_content(content: str, filename: str) -> ParsedDocument:
     duration_ms = (time.time() - start_time) * 1000
 
     return ParsedDocument(
-        documentId=generate_document_id(content.encode(), filename),
+        documentId=document_id,
         metadata=DocumentParseMetadata(
             filename=filename,
             format='txt',
@@ -372,7 +529,7 @@ def parse_txt_content(content: str, filename: str) -> ParsedDocument:
     )
 
 
-def parse_html_content(content: str, filename: str) -> ParsedDocument:
+def parse_html_content(content: str, filename: str, document_id: str) -> ParsedDocument:
     """Parse HTML content into structured blocks."""
     start_time = time.time()
     blocks: List[ContentBlock] = []
@@ -380,9 +537,11 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
     warnings: List[ParsingWarning] = []
     outline: List[DocumentOutlineItem] = []
 
-    try:
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(content, 'html.parser')
+    if BS4_AVAILABLE:
+        # Full tree on purpose: fullText is the only place text outside block tags
+        # (divs, spans, blockquotes) survives, and a SoupStrainer would only filter
+        # top-level elements anyway - bs4 keeps everything nested in a match
+        soup = BeautifulSoup(content, HTML_PARSER)
 
         # Extract title
         title = None
@@ -393,22 +552,25 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
         # Process body content
         body = soup.find('body') or soup
 
-        for element in body.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'table', 'pre', 'code', 'ul', 'ol']):
-            tag_name = element.name.lower()
+        # Stream the tree in document order instead of materializing a find_all() list
+        for element in body.descendants:
+            if element.name not in HTML_BLOCK_TAGS:
+                continue
+            tag_name = element.name
 
             # Headings
             if tag_name.startswith('h') and len(tag_name) == 2:
                 level = int(tag_name[1])
                 text = element.get_text().strip()
                 if text:
-                    blocks.append(ContentBlock(
+                    blocks.append(ContentBlock.model_construct(
                         type='heading',
                         content=text,
                         position=position,
                         headingLevel=level,
                         pageNumber=1
                     ))
-                    outline.append(DocumentOutlineItem(
+                    outline.append(DocumentOutlineItem.model_construct(
                         title=text,
                         level=level,
                         position=position,
@@ -420,7 +582,7 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
             elif tag_name == 'p':
                 text = element.get_text().strip()
                 if text:
-                    blocks.append(ContentBlock(
+                    blocks.append(ContentBlock.model_construct(
                         type='paragraph',
                         content=text,
                         position=position,
@@ -432,8 +594,8 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
             elif tag_name in ['pre', 'code']:
                 text = element.get_text().strip()
                 if text:
-                    lang = element.get('class', [None])[0] if element.get('class') else None
-                    blocks.append(ContentBlock(
+                    lang = (element.get('class') or (None,))[0]
+                    blocks.append(ContentBlock.model_construct(
                         type='code',
                         content=text,
                         position=position,
@@ -446,7 +608,7 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
             elif tag_name in ['ul', 'ol']:
                 items = [li.get_text().strip() for li in element.find_all('li', recursive=False)]
                 if items:
-                    blocks.append(ContentBlock(
+                    blocks.append(ContentBlock.model_construct(
                         type='list',
                         content='\n'.join(items),
                         position=position,
@@ -462,9 +624,11 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
                 if rows:
                     headers: List[str] = []
                     cells: List[TableCell] = []
+                    rows_md: List[List[str]] = []
 
                     for row_idx, row in enumerate(rows):
                         cols = row.find_all(['th', 'td'])
+                        row_texts: List[str] = []
                         for col_idx, col in enumerate(cols):
                             cell_text = col.get_text().strip()
                             is_header = col.name == 'th' or row_idx == 0
@@ -472,12 +636,14 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
                             if is_header and row_idx == 0:
                                 headers.append(cell_text)
 
-                            cells.append(TableCell(
+                            cells.append(TableCell.model_construct(
                                 content=cell_text,
                                 row=row_idx,
                                 col=col_idx,
                                 isHeader=is_header
                             ))
+                            row_texts.append(cell_text)
+                        rows_md.append(row_texts)
 
                     # Generate markdown
                     md_lines = []
@@ -485,18 +651,17 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
                         md_lines.append('| ' + ' | '.join(headers) + ' |')
                         md_lines.append('| ' + ' | '.join(['---'] * len(headers)) + ' |')
 
-                    for row_idx in range(1 if headers else 0, len(rows)):
-                        row_cells = [c.content for c in cells if c.row == row_idx]
-                        if row_cells:
-                            md_lines.append('| ' + ' | '.join(row_cells) + ' |')
+                    for row_texts in rows_md[1 if headers else 0:]:
+                        if row_texts:
+                            md_lines.append('| ' + ' | '.join(row_texts) + ' |')
 
                     table_md = '\n'.join(md_lines)
 
-                    blocks.append(ContentBlock(
+                    blocks.append(ContentBlock.model_construct(
                         type='table',
                         content=table_md,
                         position=position,
-                        table=TableStructure(
+                        table=TableStructure.model_construct(
                             rows=len(rows),
                             cols=len(headers) or (len(cells) // len(rows) if rows else 0),
                             headers=headers,
@@ -511,7 +676,7 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
         # Get full text
         full_text = soup.get_text(separator='\n').strip()
 
-    except ImportError:
+    else:
         warnings.append(ParsingWarning(
             code='BEAUTIFULSOUP_MISSING',
             message='BeautifulSoup not installed. Install with: pip install beautifulsoup4',
@@ -523,7 +688,7 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
     duration_ms = (time.time() - start_time) * 1000
 
     return ParsedDocument(
-        documentId=generate_document_id(content.encode(), filename),
+        documentId=document_id,
         metadata=DocumentParseMetadata(
             filename=filename,
             format='html',
@@ -541,8 +706,16 @@ def parse_html_content(content: str, filename: str) -> ParsedDocument:
     )
 
 
-def parse_with_docling(file_content: bytes, filename: str, options: ParseOptions) -> ParsedDocument:
-    """Parse document using Docling."""
+def docling_page_no(item: Any) -> int:
+    """Page of a Docling item - it lives in the item's provenance, not on the item."""
+    prov = getattr(item, 'prov', None)
+    return (getattr(prov[0], 'page_no', None) or 1) if prov else 1
+
+
+def parse_with_docling(
+    file_path: str, filename: str, options: ParseOptions, file_size: int, document_id: str
+) -> ParsedDocument:
+    """Parse a document file using Docling (runs inside a pool worker)."""
     global converter
 
     if not DOCLING_AVAILABLE or converter is None:
@@ -554,196 +727,193 @@ def parse_with_docling(file_content: bytes, filename: str, options: ParseOptions
     outline: List[DocumentOutlineItem] = []
     position = 0
 
-    # Write to temp file for Docling
     file_ext = Path(filename).suffix.lower()
-    with tempfile.NamedTemporaryFile(suffix=file_ext, delete=False) as tmp:
-        tmp.write(file_content)
-        tmp_path = tmp.name
-
-    try:
-        # Convert document
-        result = converter.convert(tmp_path)
-        doc = result.document
-
-        # Extract metadata
-        page_count = len(doc.pages) if hasattr(doc, 'pages') and doc.pages else 1
-        title = getattr(doc, 'title', None)
-
-        # Process document elements
-        if hasattr(doc, 'texts'):
-            for item in doc.texts:
-                text = item.text.strip() if hasattr(item, 'text') else str(item).strip()
-                if not text:
-                    continue
-
-                # Determine block type from Docling's labels
-                label = getattr(item, 'label', 'paragraph').lower()
-                page_num = getattr(item, 'page_no', 1) if hasattr(item, 'page_no') else 1
-
-                if 'heading' in label or 'title' in label:
-                    # Determine heading level from label or default to 2
-                    level = 1 if 'title' in label else 2
-                    if 'h1' in label: level = 1
-                    elif 'h2' in label: level = 2
-                    elif 'h3' in label: level = 3
-                    elif 'h4' in label: level = 4
-                    elif 'h5' in label: level = 5
-                    elif 'h6' in label: level = 6
-
-                    blocks.append(ContentBlock(
-                        type='heading',
-                        content=text,
-                        position=position,
-                        headingLevel=level,
-                        pageNumber=page_num
-                    ))
-                    outline.append(DocumentOutlineItem(
-                        title=text,
-                        level=level,
-                        position=position,
-                        pageNumber=page_num
-                    ))
 
-                elif 'list' in label:
-                    blocks.append(ContentBlock(
-                        type='list',
-                        content=text,
-                        position=position,
-                        listType='unordered',
-                        listItems=[text],
-                        pageNumber=page_num
-                    ))
-
-                elif 'code' in label:
-                    blocks.append(ContentBlock(
-                        type='code',
-                        content=text,
-                        position=position,
-                        pageNumber=page_num
-                    ))
-
-                elif 'caption' in label:
-                    blocks.append(ContentBlock(
-                        type='caption',
-                        content=text,
-                        position=position,
-                        pageNumber=page_num
-                    ))
-
-                elif 'footer' in label:
-                    blocks.append(ContentBlock(
-                        type='footer',
-                        content=text,
-                        position=position,
-                        pageNumber=page_num
-                    ))
+    # Convert document - with maxPages set, pages past the limit are never
+    # decoded/laid out instead of being parsed and thrown away
+    max_pages = options.maxPages if options.maxPages > 0 else None
+    if max_pages and DOCLING_PAGE_RANGE_AVAILABLE:
+        result = converter.convert(file_path, page_range=(1, max_pages))
+    else:
+        result = converter.convert(file_path)
+    doc = result.document
+
+    # Extract metadata
+    page_count = len(doc.pages) if hasattr(doc, 'pages') and doc.pages else 1
+    title = getattr(doc, 'title', None)
+
+    # Process document elements
+    if hasattr(doc, 'texts'):
+        for item in doc.texts:
+            text = item.text.strip() if hasattr(item, 'text') else str(item).strip()
+            if not text:
+                continue
+
+            # Determine block type from Docling's labels
+            label = getattr(item, 'label', 'paragraph').lower()
+            page_num = docling_page_no(item)
+            if max_pages and page_num > max_pages:
+                continue  # Formats/releases without page_range still honour maxPages
+
+            if 'heading' in label or 'title' in label:
+                # Determine heading level from label or default to 2
+                level = 1 if 'title' in label else 2
+                if 'h1' in label: level = 1
+                elif 'h2' in label: level = 2
+                elif 'h3' in label: level = 3
+                elif 'h4' in label: level = 4
+                elif 'h5' in label: level = 5
+                elif 'h6' in label: level = 6
+
+                blocks.append(ContentBlock.model_construct(
+                    type='heading',
+                    content=text,
+                    position=position,
+                    headingLevel=level,
+                    pageNumber=page_num
+                ))
+                outline.append(DocumentOutlineItem.model_construct(
+                    title=text,
+                    level=level,
+                    position=position,
+                    pageNumber=page_num
+                ))
+
+            elif 'list' in label:
+                blocks.append(ContentBlock.model_construct(
+                    type='list',
+                    content=text,
+                    position=position,
+                    listType='unordered',
+                    listItems=[text],
+                    pageNumber=page_num
+                ))
+
+            elif 'code' in label:
+                blocks.append(ContentBlock.model_construct(
+                    type='code',
+                    content=text,
+                    position=position,
+                    pageNumber=page_num
+                ))
+
+            elif 'caption' in label:
+                blocks.append(ContentBlock.model_construct(
+                    type='caption',
+                    content=text,
+                    position=position,
+                    pageNumber=page_num
+                ))
+
+            elif 'footer' in label:
+                blocks.append(ContentBlock.model_construct(
+                    type='footer',
+                    content=text,
+                    position=position,
+                    pageNumber=page_num
+                ))
+
+            elif 'header' in label:
+                blocks.append(ContentBlock.model_construct(
+                    type='header',
+                    content=text,
+                    position=position,
+                    pageNumber=page_num
+                ))
+
+            else:
+                # Default to paragraph
+                blocks.append(ContentBlock.model_construct(
+                    type='paragraph',
+                    content=text,
+                    position=position,
+                    pageNumber=page_num
+                ))
 
-                elif 'header' in label:
-                    blocks.append(ContentBlock(
-                        type='header',
-                        content=text,
-                        position=position,
-                        pageNumber=page_num
-                    ))
+            position += 1
 
-                else:
-                    # Default to paragraph
-                    blocks.append(ContentBlock(
-                        type='paragraph',
-                        content=text,
-                        position=position,
-                        pageNumber=page_num
-                    ))
+    # Process tables if enabled
+    if options.extractTables and hasattr(doc, 'tables'):
+        for table_idx, table in enumerate(doc.tables):
+            table_page = docling_page_no(table)
+            if max_pages and table_page > max_pages:
+                continue
+            try:
+                # Get table data
+                table_data = table.export_to_dataframe() if hasattr(table, 'export_to_dataframe') else None
+
+                if table_data is not None:
+                    # Convert the whole frame to native str lists once instead of row-wise iterrows()
+                    headers = [str(h) for h in table_data.columns]
+                    values = table_data.astype(str).to_numpy().tolist()
+                    cells: List[TableCell] = []
 
-                position += 1
+                    # Header row
+                    for col_idx, header in enumerate(headers):
+                        cells.append(TableCell.model_construct(
+                            content=header,
+                            row=0,
+                            col=col_idx,
+                            isHeader=True
+                        ))
 
-        # Process tables if enabled
-        if options.extractTables and hasattr(doc, 'tables'):
-            for table_idx, table in enumerate(doc.tables):
-                try:
-                    # Get table data
-                    table_data = table.export_to_dataframe() if hasattr(table, 'export_to_dataframe') else None
-
-                    if table_data is not None:
-                        headers = list(table_data.columns)
-                        cells: List[TableCell] = []
-
-                        # Header row
-                        for col_idx, header in enumerate(headers):
-                            cells.append(TableCell(
-                                content=str(header),
-                                row=0,
+                    # Data rows (cells and markdown in the same pass)
+                    md_lines = ['| ' + ' | '.join(headers) + ' |']
+                    md_lines.append('| ' + ' | '.join(['---'] * len(headers)) + ' |')
+                    for row_idx, row in enumerate(values, start=1):
+                        for col_idx, value in enumerate(row):
+                            cells.append(TableCell.model_construct(
+                                content=value,
+                                row=row_idx,
                                 col=col_idx,
-                                isHeader=True
+                                isHeader=False
                             ))
+                        md_lines.append('| ' + ' | '.join(row) + ' |')
+                    table_md = '\n'.join(md_lines)
 
-                        # Data rows
-                        for row_idx, row in table_data.iterrows():
-                            for col_idx, value in enumerate(row):
-                                cells.append(TableCell(
-                                    content=str(value),
-                                    row=int(row_idx) + 1,
-                                    col=col_idx,
-                                    isHeader=False
-                                ))
-
-                        # Generate markdown
-                        md_lines = ['| ' + ' | '.join(str(h) for h in headers) + ' |']
-                        md_lines.append('| ' + ' | '.join(['---'] * len(headers)) + ' |')
-                        for _, row in table_data.iterrows():
-                            md_lines.append('| ' + ' | '.join(str(v) for v in row) + ' |')
-                        table_md = '\n'.join(md_lines)
-
-                        blocks.append(ContentBlock(
-                            type='table',
-                            content=table_md,
-                            position=position,
-                            table=TableStructure(
-                                rows=len(table_data) + 1,
-                                cols=len(headers),
-                                headers=[str(h) for h in headers],
-                                cells=cells,
-                                markdown=table_md,
-                                hasHeader=True
-                            ),
-                            pageNumber=getattr(table, 'page_no', 1) if hasattr(table, 'page_no') else 1
-                        ))
-                        position += 1
-
-                except Exception as e:
-                    warnings.append(ParsingWarning(
-                        code='TABLE_EXTRACTION_FAILED',
-                        message=f'Failed to extract table {table_idx}: {str(e)}',
-                        severity='warning'
+                    blocks.append(ContentBlock.model_construct(
+                        type='table',
+                        content=table_md,
+                        position=position,
+                        table=TableStructure.model_construct(
+                            rows=len(values) + 1,
+                            cols=len(headers),
+                            headers=headers,
+                            cells=cells,
+                            markdown=table_md,
+                            hasHeader=True
+                        ),
+                        pageNumber=table_page
                     ))
+                    position += 1
 
-        # Get full text
-        full_text = doc.export_to_markdown() if hasattr(doc, 'export_to_markdown') else '\n'.join(b.content for b in blocks)
+            except Exception as e:
+                warnings.append(ParsingWarning(
+                    code='TABLE_EXTRACTION_FAILED',
+                    message=f'Failed to extract table {table_idx}: {str(e)}',
+                    severity='warning'
+                ))
 
-        # Detect format
-        format_map = {
-            '.pdf': 'pdf',
-            '.docx': 'docx',
-            '.pptx': 'pptx',
-            '.xlsx': 'xlsx',
-        }
-        detected_format = format_map.get(file_ext, 'pdf')
+    # Get full text
+    full_text = doc.export_to_markdown() if hasattr(doc, 'export_to_markdown') else '\n'.join(b.content for b in blocks)
 
-    finally:
-        # Cleanup temp file
-        try:
-            os.unlink(tmp_path)
-        except:
-            pass
+    # Detect format
+    format_map = {
+        '.pdf': 'pdf',
+        '.docx': 'docx',
+        '.pptx': 'pptx',
+        '.xlsx': 'xlsx',
+    }
+    detected_format = format_map.get(file_ext, 'pdf')
 
     duration_ms = (time.time() - start_time) * 1000
 
     return ParsedDocument(
-        documentId=generate_document_id(file_content, filename),
+        documentId=document_id,
         metadata=DocumentParseMetadata(
             filename=filename,
             format=detected_format,
-            fileSize=len(file_content),
+            fileSize=file_size,
             pageCount=page_count,
             title=title,
             parsingDurationMs=duration_ms,
@@ -758,49 +928,200 @@ def parse_with_docling(file_content: bytes, filename: str, options: ParseOptions
     )
 
 
+# Native parsers by detected format (everything else goes to Docling)
+NATIVE_PARSERS = {
+    'md': parse_markdown_content,
+    'txt': parse_txt_content,
+    'html': parse_html_content,
+}
+
+
+# ============================================
+# Parse Result Cache
+# ============================================
+
+class ParseCache:
+    """
+    Two-tier cache of parsed documents keyed by content hash.
+
+    Tier 1 is an in-process LRU of serialized JSON bytes, tier 2 an optional
+    shared Redis instance. Only successful parses are cached. Hits come back
+    as plain dicts - the bytes were validated when the parse produced them.
+    """
+
+    def __init__(self, max_bytes: int, ttl: int, redis_url: Optional[str] = None):
+        self.local: LRUCache = LRUCache(maxsize=max_bytes, getsizeof=len)
+        self.ttl = ttl
+        # Parses currently running, so identical concurrent uploads share one parse
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.redis = aioredis.from_url(redis_url) if redis_url and REDIS_AVAILABLE else None
+
+    @staticmethod
+    def options_hash(detected_format: str, options: ParseOptions) -> str:
+        """Short digest of everything besides the content that shapes the parse."""
+        return hashlib.sha256(f"{detected_format}:{options.model_dump_json()}".encode()).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(content_hash: bytes, detected_format: str, options: ParseOptions) -> str:
+        """Build the cache key - different formats/options never collide."""
+        return f"parse:v1:{content_hash.hex()}:{ParseCache.options_hash(detected_format, options)}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.local.get(key)
+        if data is None and self.redis:
+            try:
+                data = await self.redis.get(key)
+            except Exception as e:
+                print(f"Parse cache: Redis read failed: {e}")
+            if data is not None:
+                self._store_local(key, data)
+        return orjson.loads(data) if data is not None else None
+
+    async def set(self, key: str, document: ParsedDocument):
+        data = document.model_dump_json().encode()
+        self._store_local(key, data)
+        if self.redis:
+            try:
+                await self.redis.setex(key, self.ttl, data)
+            except Exception as e:
+                print(f"Parse cache: Redis write failed: {e}")
+
+    def _store_local(self, key: str, data: bytes):
+        try:
+            self.local[key] = data
+        except ValueError:
+            pass  # Larger than the whole in-process budget - Redis only
+
+    async def close(self):
+        if self.redis:
+            await self.redis.aclose()
+
+
+def make_etag(content_hash: bytes, detected_format: str, options: ParseOptions) -> str:
+    """ETag of a parse result - same content parsed with other options is another representation."""
+    return f'"{content_hash.hex()}-{ParseCache.options_hash(detected_format, options)}"'
+
+
 # ============================================
 # FastAPI App
 # ============================================
 
+def create_converter() -> "DocumentConverter":
+    """Build a Docling converter with the service's pipeline configuration."""
+    pdf_format_kwargs = {}
+    if DOCLING_THREADED_AVAILABLE:
+        # Threaded pipeline: pages flow through bounded per-stage queues in parallel
+        pipeline_options = ThreadedPdfPipelineOptions(queue_max_size=DOCLING_QUEUE_SIZE)
+        pdf_format_kwargs['pipeline_cls'] = ThreadedStandardPdfPipeline
+    else:
+        pipeline_options = PdfPipelineOptions()
+    pipeline_options.accelerator_options.num_threads = DOCLING_THREADS
+    pipeline_options.do_ocr = False  # Disable OCR (saves ~75% processing time)
+    pipeline_options.do_table_structure = False  # Disable - causes hang on large PDFs
+    pipeline_options.document_timeout = 300  # 5 min safety timeout
+
+    return DocumentConverter(
+        allowed_formats=[
+            InputFormat.PDF,
+            InputFormat.DOCX,
+            InputFormat.PPTX,
+            InputFormat.XLSX,
+            InputFormat.HTML,
+        ],
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_options=pipeline_options,
+                **pdf_format_kwargs,
+            )
+        }
+    )
+
+
+def init_docling_worker():
+    """
+    Process pool initializer - each worker builds its own converter.
+
+    Workers are spawned rather than forked so no model state, CUDA context or
+    threads are inherited from the server process; every worker loads an
+    independent set of Docling models.
+    """
+    global converter
+    try:
+        converter = create_converter()
+    except Exception as e:
+        print(f"Failed to load Docling in worker {os.getpid()}: {e}")
+        converter = None
+
+
+def docling_worker_ready() -> bool:
+    """Report whether this pool worker has a converter."""
+    return converter is not None
+
+
+def new_docling_pool() -> ProcessPoolExecutor:
+    """Create the Docling process pool (workers load their converter on spawn)."""
+    return ProcessPoolExecutor(
+        max_workers=PARSER_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_docling_worker,
+    )
+
+
+def restart_docling_pool(broken_pool: ProcessPoolExecutor):
+    """
+    Replace a pool broken by a dying worker (e.g. OOM-killed on a huge PDF).
+
+    A BrokenProcessPool never recovers, so without this every later Docling
+    request would fail until the service is restarted. Concurrent requests
+    that saw the same broken pool only replace it once.
+    """
+    global docling_pool
+    if docling_pool is broken_pool:
+        print("Docling worker died - restarting the worker pool")
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        docling_pool = new_docling_pool()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load Docling on startup."""
-    global converter
+    """Start the parser executors and open the parse cache on startup."""
+    global docling_pool, docling_semaphore, native_executor, parse_cache
+
+    native_executor = ThreadPoolExecutor(max_workers=NATIVE_PARSER_THREADS, thread_name_prefix="native-parser")
+
+    parse_cache = ParseCache(PARSER_CACHE_MB * 1024 * 1024, PARSER_CACHE_TTL, REDIS_URL)
+    if parse_cache.redis:
+        print(f"Parse cache: Redis tier enabled (TTL {PARSER_CACHE_TTL}s)")
 
     if DOCLING_AVAILABLE:
-        print("Loading Docling document converter...")
+        print("Starting Docling worker pool...")
         start = time.time()
         try:
-            # Configure pipeline options
-            pipeline_options = PdfPipelineOptions()
-            pipeline_options.do_ocr = False  # Disable OCR (saves ~75% processing time)
-            pipeline_options.do_table_structure = False  # Disable - causes hang on large PDFs
-            pipeline_options.document_timeout = 300  # 5 min safety timeout
-
-            converter = DocumentConverter(
-                allowed_formats=[
-                    InputFormat.PDF,
-                    InputFormat.DOCX,
-                    InputFormat.PPTX,
-                    InputFormat.XLSX,
-                    InputFormat.HTML,
-                ],
-                format_options={
-                    InputFormat.PDF: PdfFormatOption(
-                        pipeline_options=pipeline_options,
-                    )
-                }
-            )
-            print(f"Docling loaded in {time.time() - start:.2f}s")
+            docling_pool = new_docling_pool()
+            docling_semaphore = asyncio.Semaphore(PARSER_WORKERS)
+
+            # Probe a worker so a broken Docling install surfaces at startup
+            if not await asyncio.get_running_loop().run_in_executor(docling_pool, docling_worker_ready):
+                raise RuntimeError("converter could not be created in worker process")
+
+            pipeline = "threaded" if DOCLING_THREADED_AVAILABLE else "standard"
+            print(f"Docling loaded in {time.time() - start:.2f}s ({PARSER_WORKERS} workers, {pipeline} PDF pipeline)")
         except Exception as e:
             print(f"Failed to load Docling: {e}")
-            converter = None
+            if docling_pool:
+                docling_pool.shutdown(wait=False, cancel_futures=True)
+                docling_pool = None
     else:
         print("Docling not available - using native parsers only")
 
     yield
 
     print("Shutting down parser service")
+    if docling_pool:
+        docling_pool.shutdown(wait=False, cancel_futures=True)
+        docling_pool = None
+    native_executor.shutdown(wait=False, cancel_futures=True)
+    await parse_cache.close()
 
 
 app = FastAPI(
@@ -815,7 +1136,7 @@ app = FastAPI(
 async def health():
     """Health check endpoint."""
     return HealthResponse(
-        status="ok" if (DOCLING_AVAILABLE and converter) or True else "loading",
+        status="ok" if docling_pool or True else "loading",
         parser="docling" if DOCLING_AVAILABLE else "native",
         version="1.0.0",
         supportedFormats=SUPPORTED_FORMATS,
@@ -823,12 +1144,154 @@ async def health():
     )
 
 
-@app.post("/parse", response_model=ParseResponse)
-async def parse(request: ParseRequest):
+async def run_parser(
+    filename: str,
+    detected_format: str,
+    options: ParseOptions,
+    file_content: Optional[bytes] = None,
+    file_path: Optional[str] = None,
+    *,
+    document_id: str,
+) -> ParsedDocument:
     """
-    Parse a document and extract structured content.
+    Dispatch to the parser for the detected format.
 
-    Supports PDF, DOCX, PPTX, XLSX, HTML, MD, TXT formats.
+    MD/TXT/HTML go to the native parser thread pool; PDF/DOCX/PPTX/XLSX go to
+    the Docling process pool, where the heavy lifting gets real parallelism.
+    The document is given either as in-memory bytes or as an already spooled
+    file (streamed uploads).
+    """
+    loop = asyncio.get_running_loop()
+
+    # Native parsers are light and string-bound - run them on the thread pool
+    native_parser = NATIVE_PARSERS.get(detected_format)
+    if native_parser:
+        if file_content is None:
+            file_content = await loop.run_in_executor(native_executor, Path(file_path).read_bytes)
+        content = file_content.decode('utf-8', errors='replace')
+        return await loop.run_in_executor(native_executor, native_parser, content, filename, document_id)
+
+    if docling_pool:
+        # Use Docling for PDF, DOCX, PPTX, XLSX (CPU-bound - runs in the process pool).
+        # Workers receive a file path, never the payload itself.
+        # Spooled under the semaphore, so at most PARSER_WORKERS payloads sit
+        # in tmpfs at once
+        async with docling_semaphore:
+            tmp_path = None
+            if file_path is None:
+                tmp_path = file_path = await asyncio.to_thread(spool_bytes, file_content, Path(filename).suffix.lower())
+                file_size = len(file_content)
+            else:
+                file_size = os.path.getsize(file_path)
+
+            try:
+                pool = docling_pool
+                try:
+                    return await loop.run_in_executor(
+                        pool, parse_with_docling, file_path, filename, options, file_size, document_id
+                    )
+                except BrokenProcessPool:
+                    # Not retried - the same document may well kill the next worker too
+                    restart_docling_pool(pool)
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Docling worker crashed (out of memory?) - worker pool restarted, retry the request"
+                    )
+            finally:
+                if tmp_path:
+                    remove_file(tmp_path)
+
+    # Fallback for binary formats without Docling
+    raise HTTPException(
+        status_code=503,
+        detail=f"Docling not available for {detected_format} parsing. Install docling package."
+    )
+
+
+async def parse_document(
+    content_hash: bytes,
+    filename: str,
+    document_id: str,
+    detected_format: str,
+    options: ParseOptions,
+    run: Callable[[], Awaitable[ParsedDocument]],
+) -> Union[ParsedDocument, Dict[str, Any]]:
+    """
+    Parse a document via run(), serving identical uploads from the parse cache.
+
+    Identical documents that arrive while a parse is running (e.g. duplicates
+    within a batch) wait for that parse instead of starting their own.
+    Cached and shared results carry this request's filename and document ID;
+    cache hits are returned as the decoded JSON dict (see document_response).
+    """
+    cache_key = ParseCache.make_key(content_hash, detected_format, options)
+
+    cached = await parse_cache.get(cache_key)
+    if cached is not None:
+        cached['metadata']['filename'] = filename
+        cached['documentId'] = document_id
+        return cached
+
+    # A failed shared parse wakes every waiter - the first one to get here
+    # retries, the others wait on that retry in turn
+    while (pending := parse_cache.inflight.get(cache_key)) is not None:
+        shared = await asyncio.shield(pending)
+        if shared is not None:
+            metadata = shared.metadata.model_copy(update={'filename': filename})
+            return shared.model_copy(update={'metadata': metadata, 'documentId': document_id})
+
+    future = asyncio.get_running_loop().create_future()
+    parse_cache.inflight[cache_key] = future
+    document = None
+    try:
+        document = await run()
+        if document.success:
+            await parse_cache.set(cache_key, document)
+        return document
+    finally:
+        if parse_cache.inflight.get(cache_key) is future:
+            del parse_cache.inflight[cache_key]
+        if not future.done():
+            future.set_result(document if document is not None and document.success else None)
+
+
+def document_response(document: Union[ParsedDocument, Dict[str, Any]], processing_time: float) -> ParseResponse:
+    """
+    Wrap a parse_document() result in a ParseResponse.
+
+    Cache hits are plain dicts of already validated data, so they are attached
+    with model_construct instead of being validated into models again.
+    """
+    if isinstance(document, dict):
+        return ParseResponse.model_construct(success=True, document=document, processingTimeMs=round(processing_time, 2))
+    return ParseResponse(success=document.success, document=document, processingTimeMs=round(processing_time, 2))
+
+
+def dump_response(response: ParseResponse) -> Dict[str, Any]:
+    if isinstance(response.document, dict):
+        return {**response.model_dump(exclude={'document'}), 'document': response.document}
+    return response.model_dump()
+
+
+def parse_response(response: Any, etag: Optional[str] = None) -> ORJSONResponse:
+    """
+    Encode a ParseResponse (or a list of them) with orjson.
+
+    Returning the Response directly skips FastAPI's dump-and-revalidate pass
+    over the whole block tree; response_model stays on the routes for the
+    OpenAPI schema. A single document gets its ETag (see make_etag).
+    """
+    if isinstance(response, list):
+        return ORJSONResponse([dump_response(r) for r in response])
+    headers = {'ETag': etag} if etag else None
+    return ORJSONResponse(dump_response(response), headers=headers)
+
+
+async def parse_request(request: ParseRequest) -> Tuple[ParseResponse, Optional[str]]:
+    """
+    Decode and parse a single base64 ParseRequest.
+
+    Returns the response and its ETag (None if the request failed).
     """
     start_time = time.time()
 
@@ -841,7 +1304,7 @@ async def parse(request: ParseRequest):
 
         # Check file size
         if len(file_content) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=413, detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB")
+            raise file_too_large()
 
         # Detect format
         detected_format = get_format_from_filename(request.filename)
@@ -851,47 +1314,128 @@ async def parse(request: ParseRequest):
         # Get options
         options = request.options or ParseOptions()
 
+        # One hash pass serves the cache key, document ID and ETag
+        content_hasher = new_content_hasher()
+        content_hasher.update(file_content)
+        content_hash = content_hasher.digest()
+        document_id = generate_document_id(content_hash, request.filename)
+
         # Parse based on format
-        if detected_format in ['md', 'markdown']:
-            content = file_content.decode('utf-8', errors='replace')
-            document = parse_markdown_content(content, request.filename)
+        document = await parse_document(
+            content_hash,
+            request.filename,
+            document_id,
+            detected_format,
+            options,
+            lambda: run_parser(
+                request.filename, detected_format, options, file_content=file_content, document_id=document_id
+            ),
+        )
 
-        elif detected_format == 'txt':
-            content = file_content.decode('utf-8', errors='replace')
-            document = parse_txt_content(content, request.filename)
+        processing_time = (time.time() - start_time) * 1000
 
-        elif detected_format == 'html':
-            content = file_content.decode('utf-8', errors='replace')
-            document = parse_html_content(content, request.filename)
+        return document_response(document, processing_time), make_etag(content_hash, detected_format, options)
 
-        elif DOCLING_AVAILABLE and converter:
-            # Use Docling for PDF, DOCX, PPTX, XLSX
-            document = parse_with_docling(file_content, request.filename, options)
+    except HTTPException:
+        raise
+    except Exception as e:
+        processing_time = (time.time() - start_time) * 1000
+        return ParseResponse(
+            success=False,
+            error=str(e),
+            processingTimeMs=round(processing_time, 2)
+        ), None
 
-        else:
-            # Fallback for binary formats without Docling
-            raise HTTPException(
-                status_code=503,
-                detail=f"Docling not available for {detected_format} parsing. Install docling package."
-            )
+
+@app.post("/parse", response_model=ParseResponse, response_class=ORJSONResponse)
+async def parse(request: ParseRequest):
+    """
+    Parse a document and extract structured content.
+
+    Supports PDF, DOCX, PPTX, XLSX, HTML, MD, TXT formats.
+    """
+    return parse_response(*await parse_request(request))
+
+
+@app.post("/parse-batch", response_model=List[ParseResponse], response_class=ORJSONResponse)
+async def parse_batch(requests: List[ParseRequest]):
+    """
+    Parse several documents in one round-trip.
+
+    Items are parsed concurrently (BATCH_CONCURRENCY at a time) and returned
+    in request order. A failing item yields success=False with the error
+    instead of failing the whole batch; duplicate files are parsed once.
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def parse_one(request: ParseRequest) -> ParseResponse:
+        async with semaphore:
+            try:
+                response, _ = await parse_request(request)
+                return response
+            except HTTPException as e:
+                return ParseResponse(success=False, error=str(e.detail), processingTimeMs=0)
+
+    return parse_response(list(await asyncio.gather(*(parse_one(r) for r in requests))))
+
+
+@app.post("/parse-upload", response_model=ParseResponse, response_class=ORJSONResponse)
+async def parse_upload(file: UploadFile = File(...), options: Optional[str] = Form(None)):
+    """
+    Parse a document sent as multipart/form-data.
+
+    Preferred over /parse for large files: the upload is streamed to disk
+    while it is hashed, skipping the base64 decode and in-memory copies.
+    `options` is an optional JSON-encoded ParseOptions object.
+    """
+    start_time = time.time()
+    filename = file.filename or ''
+    tmp_path = None
+
+    try:
+        # Detect format
+        detected_format = get_format_from_filename(filename)
+        if not detected_format:
+            raise HTTPException(status_code=400, detail=f"Unsupported file format: {filename}")
+
+        # Get options
+        try:
+            parse_options = ParseOptions.model_validate_json(options) if options else ParseOptions()
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid options: {str(e)}")
+
+        # Stream to disk, hashing on the way
+        tmp_path, content_hasher, _ = await spool_upload(file, Path(filename).suffix.lower())
+        content_hash = content_hasher.digest()
+        document_id = generate_document_id(content_hash, filename)
+
+        document = await parse_document(
+            content_hash,
+            filename,
+            document_id,
+            detected_format,
+            parse_options,
+            lambda: run_parser(filename, detected_format, parse_options, file_path=tmp_path, document_id=document_id),
+        )
 
         processing_time = (time.time() - start_time) * 1000
 
-        return ParseResponse(
-            success=document.success,
-            document=document,
-            processingTimeMs=round(processing_time, 2)
+        return parse_response(
+            document_response(document, processing_time), make_etag(content_hash, detected_format, parse_options)
         )
 
     except HTTPException:
         raise
     except Exception as e:
         processing_time = (time.time() - start_time) * 1000
-        return ParseResponse(
+        return parse_response(ParseResponse(
             success=False,
             error=str(e),
             processingTimeMs=round(processing_time, 2)
-        )
+        ))
+    finally:
+        if tmp_path:
+            remove_file(tmp_path)
 
 
 @app.get("/formats")
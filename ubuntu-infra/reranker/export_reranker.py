@@ -0,0 +1,46 @@
+"""
+Export the reranker model to ONNX for the onnx backend
+
+Writes the plain ONNX export plus optimized and int8 quantized variants
+into RERANKER_MODEL_DIR; reranker_service.py picks one per hardware.
+The source model name goes to source_model.txt, so a changed RERANKER_MODEL
+is noticed by the service and by deploy-ubuntu.sh.
+
+Usage: python export_reranker.py
+"""
+
+import os
+
+from sentence_transformers import CrossEncoder
+from sentence_transformers import export_dynamic_quantized_onnx_model, export_optimized_onnx_model
+
+MODEL_NAME = os.getenv("RERANKER_MODEL", "BAAI/bge-reranker-v2-m3")
+MODEL_DIR = os.getenv("RERANKER_MODEL_DIR", "model")
+MODEL_SOURCE_FILE = "source_model.txt"
+
+
+def main():
+    print(f"Exporting {MODEL_NAME} to {MODEL_DIR}")
+    model = CrossEncoder(MODEL_NAME, max_length=512, backend="onnx")
+    model.save_pretrained(MODEL_DIR)
+
+    # O3: fused fp32 graph for CPU
+    export_optimized_onnx_model(model, "O3", MODEL_DIR)
+
+    # O4 adds fp16 and only runs on CUDA
+    try:
+        export_optimized_onnx_model(model, "O4", MODEL_DIR)
+    except Exception as e:
+        print(f"Skipping O4 export (needs a CUDA device): {e}")
+
+    # int8 dynamic quantization for Xeons with AVX-512 VNNI
+    export_dynamic_quantized_onnx_model(model, "avx512_vnni", MODEL_DIR)
+
+    # Written last, so an interrupted export is redone on the next deploy
+    with open(os.path.join(MODEL_DIR, MODEL_SOURCE_FILE), "w") as f:
+        f.write(MODEL_NAME + "\n")
+    print("Export complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,80 +1,578 @@
 """
 Reranker Microservice - BGE-reranker-v2-m3
+Phase 1 - RAG V2 Implementation
+
+Usage: uvicorn reranker_service:app --host 0.0.0.0 --port 8001
+
+Deployment profiles (RERANKER_MODEL):
+  accurate  BAAI/bge-reranker-v2-m3                (default, 568M params)
+  balanced  BAAI/bge-reranker-base                 (278M params)
+  fast      cross-encoder/ms-marco-MiniLM-L-6-v2   (22M params, English only)
 """
+
 import os
 import time
-from typing import List, Optional
+import asyncio
+import hashlib
+import threading
+from typing import List, Optional, Tuple, Callable
+from functools import lru_cache
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
+# CPU threading - has to be set before numpy/torch load their OpenMP runtime.
+# Run one uvicorn process per NUMA node (pinned with numactl) rather than
+# `--workers N`, which loads a model copy per worker and thrashes the caches.
+NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", str(os.cpu_count() or 1)))
+# Scoring runs in flight at once. One run gets every thread; raising this
+# splits NUM_THREADS between the runs instead of oversubscribing the cores
+WORKERS = max(1, int(os.getenv("RERANKER_WORKERS", "1")))
+INTRA_OP_THREADS = max(1, NUM_THREADS // WORKERS)
+os.environ.setdefault("OMP_NUM_THREADS", str(INTRA_OP_THREADS))
+os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact,1,0")
+os.environ.setdefault("KMP_BLOCKTIME", "1")
+
+import numpy as np
+import torch
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sentence_transformers import CrossEncoder
 
+# ONNX Runtime session tuning for the onnx backend
+try:
+    import onnxruntime as ort
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
+
+# Configuration
 MODEL_NAME = os.getenv("RERANKER_MODEL", "BAAI/bge-reranker-v2-m3")
 DEFAULT_TOP_K = int(os.getenv("RERANKER_TOP_K", "5"))
 
+# Known profiles with their latency relative to bge-reranker-v2-m3
+MODEL_PROFILES = {
+    "BAAI/bge-reranker-v2-m3": "accurate - baseline latency",
+    "BAAI/bge-reranker-base": "balanced - ~3-5x faster",
+    "cross-encoder/ms-marco-MiniLM-L-6-v2": "fast - ~15-25x faster",
+}
+
+# Query tokens kept in each pair - the rest of max_length goes to the document
+MAX_QUERY_TOKENS = int(os.getenv("RERANKER_MAX_QUERY_TOKENS", "256"))
+# Documents are cut to this many characters before tokenizing - well past what
+# fits in max_length (~4 chars per token), but bounds tokenizer work on huge inputs
+MAX_DOC_CHARS = int(os.getenv("RERANKER_MAX_DOC_CHARS", "4096"))
+# Device to run on - explicit so a mixed host never silently runs on CPU.
+# Every CPU/GPU choice below (precision, quantization, ONNX provider)
+# follows it, so RERANKER_DEVICE=cpu on a GPU host gets the full CPU setup
+DEVICE = os.getenv("RERANKER_DEVICE") or ("cuda" if torch.cuda.is_available() else "cpu")
+ON_GPU = torch.device(DEVICE).type == "cuda"
+# Pairs per forward pass - ~128 on GPU, 16-32 on CPU/ONNX
+BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "64"))
+# Dynamic batching: concurrent requests are coalesced into one scoring run of up
+# to MAX_BATCH_PAIRS pairs, waiting at most MAX_WAIT_MS for companions
+MAX_BATCH_PAIRS = int(os.getenv("RERANKER_MAX_BATCH_PAIRS", str(BATCH_SIZE * 4)))
+MAX_WAIT_MS = float(os.getenv("RERANKER_MAX_WAIT_MS", "5"))
+
+# (query, document) -> score LRU entries, 0 disables the cache
+CACHE_SIZE = int(os.getenv("RERANKER_CACHE_SIZE", "50000"))
+
+# Inference backend: "onnx" (default), "openvino" or "torch"
+BACKEND = os.getenv("RERANKER_BACKEND", "onnx")
+# Directory with the pre-exported ONNX variants (see export_reranker.py)
+MODEL_DIR = os.getenv("RERANKER_MODEL_DIR", "")
+# Written by export_reranker.py - names the model the directory was exported from
+MODEL_SOURCE_FILE = "source_model.txt"
+# ONNX file inside the model directory - picked per hardware when unset
+ONNX_FILE = os.getenv("RERANKER_ONNX_FILE", "")
+# Int8 dynamic quantization on CPU (VNNI ONNX variant / torch quantize_dynamic)
+QUANTIZE = os.getenv("RERANKER_QUANTIZE", "1") == "1"
+# torch.compile the forward pass (torch backend only)
+COMPILE = os.getenv("RERANKER_COMPILE", "1") == "1"
+# Sequence lengths batches are padded up to, so compiled kernels / CUDA graphs
+# are reused per bucket. Empty pads to the longest pair (default off ONNX/OpenVINO)
+BUCKETS = sorted(
+    int(b) for b in os.getenv("RERANKER_BUCKETS", "64,128,256,512" if BACKEND == "torch" else "").split(",") if b
+)
+
+# Global model instance
 model: Optional[CrossEncoder] = None
+# Forward pass used for scoring - model.model, or its compiled version
+model_forward: Optional[Callable] = None
+
+# Pending (query, documents, future) rerank jobs for the batcher
+batch_queue: Optional[asyncio.Queue] = None
+batcher_task: Optional[asyncio.Task] = None
+
+# Scoring runs off the event loop so health checks and queuing stay responsive
+executor: Optional[ThreadPoolExecutor] = None
+
+# The fast tokenizer's backend is not safe for concurrent calls
+tokenizer_lock = threading.Lock()
+
+# Scores of previously seen (query, document) pairs
+score_cache: Optional['ScoreCache'] = None
+
+
+def cpu_has_avx512_vnni() -> bool:
+    """Check /proc/cpuinfo for AVX-512 VNNI (int8 dot products on Xeon)."""
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    return 'avx512_vnni' in line.split()
+    except OSError:
+        pass
+    return False
+
+
+def onnx_model_kwargs(model_dir: str) -> dict:
+    """
+    ONNX Runtime provider and model file for this machine.
+
+    GPU gets the fp16 O4 graph, VNNI-capable CPUs the int8 quantized graph
+    (unless RERANKER_QUANTIZE=0) and everything else the fused fp32 O3 graph -
+    falling back to the plain export when the chosen variant is missing.
+    On GPU, inputs and outputs are bound to device buffers (IOBinding).
+    The CUDA provider is only used when the installed onnxruntime has it
+    (onnxruntime-gpu) - the CPU build would otherwise fail to load the session.
+    """
+    cuda_provider = ORT_AVAILABLE and "CUDAExecutionProvider" in ort.get_available_providers()
+    if ON_GPU and not cuda_provider:
+        print("CUDAExecutionProvider not available (install onnxruntime-gpu) - running ONNX on CPU")
+    if ON_GPU and cuda_provider:
+        provider, file_name = "CUDAExecutionProvider", "onnx/model_O4.onnx"
+    elif QUANTIZE and cpu_has_avx512_vnni():
+        provider, file_name = "CPUExecutionProvider", "onnx/model_qint8_avx512_vnni.onnx"
+    else:
+        provider, file_name = "CPUExecutionProvider", "onnx/model_O3.onnx"
+
+    file_name = ONNX_FILE or file_name
+    if not os.path.isfile(os.path.join(model_dir, file_name)):
+        file_name = "onnx/model.onnx"
+    model_kwargs = {"provider": provider, "file_name": file_name, "use_io_binding": provider == "CUDAExecutionProvider"}
+    if ORT_AVAILABLE:
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = INTRA_OP_THREADS
+        session_options.inter_op_num_threads = 1
+        model_kwargs["session_options"] = session_options
+    return model_kwargs
+
+
+def exported_model_name(model_dir: str) -> Optional[str]:
+    """Model the ONNX directory was exported from, None for exports without a marker."""
+    try:
+        with open(os.path.join(model_dir, MODEL_SOURCE_FILE)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def load_model() -> CrossEncoder:
+    """Load the cross-encoder on the configured backend."""
+    if BACKEND == "torch":
+        model = CrossEncoder(MODEL_NAME, max_length=512, device=DEVICE)
+        if ON_GPU:
+            # Half-precision weights use the tensor cores and halve memory traffic.
+            # bf16 only on Ampere+ - T4/V100 report (emulated) bf16 support but
+            # only have fp16 tensor cores
+            dtype = torch.bfloat16 if torch.cuda.get_device_capability(DEVICE)[0] >= 8 else torch.float16
+            model.model.to(dtype)
+            print(f"Model weights cast to {dtype}")
+        model.model.eval()
+        if not ON_GPU and QUANTIZE:
+            # Int8 Linear layers (VNNI kernels on Xeon)
+            torch.ao.quantization.quantize_dynamic(model.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            print("Model quantized to int8")
+        return model
+
+    model_dir = MODEL_DIR if BACKEND == "onnx" and MODEL_DIR and os.path.isdir(MODEL_DIR) else ""
+    exported_name = exported_model_name(model_dir) if model_dir else None
+    if exported_name and exported_name != MODEL_NAME:
+        # Stale export of another model - RERANKER_MODEL wins
+        print(f"Ignoring {model_dir}: exported from {exported_name}, not {MODEL_NAME} - rerun export_reranker.py")
+        model_dir = ""
+
+    if model_dir:
+        model_kwargs = onnx_model_kwargs(model_dir)
+        print(f"ONNX model: {model_kwargs['file_name']} ({model_kwargs['provider']})")
+        return CrossEncoder(model_dir, max_length=512, device=DEVICE, backend="onnx", model_kwargs=model_kwargs)
+
+    # No pre-exported model - sentence-transformers exports one on the fly
+    return CrossEncoder(MODEL_NAME, max_length=512, device=DEVICE, backend=BACKEND)
+
+
+def warmup_model():
+    """
+    Score a full batch per bucket length before traffic arrives.
+
+    The first forward passes pay for kernel compilation, CUDA graph capture
+    and allocator/session setup - that cost lands here instead of on the
+    first requests.
+    """
+    start = time.time()
+    word_tokens = len(model.tokenizer("warmup", add_special_tokens=False).input_ids) or 1
+    for length in BUCKETS or [model.max_length]:
+        # Stay a little under the bucket so the batch pads up to exactly it
+        document = " ".join(["warmup"] * max(1, (length - 8) // word_tokens))
+        score_batch([("warmup query", [document] * BATCH_SIZE)])
+    print(f"Model warmed up in {time.time() - start:.2f}s")
+
+
+def compile_model():
+    """
+    torch.compile the forward pass, compiling it during the warmup.
+
+    Compilation happens on the first call, so a failure there (e.g. on an
+    int8 quantized model) falls back to eager mode.
+    """
+    global model_forward
+    model_forward = torch.compile(model.model, mode="reduce-overhead", dynamic=True)
+    try:
+        warmup_model()
+    except Exception as e:
+        print(f"torch.compile failed, using eager mode: {e}")
+        model_forward = model.model
+        warmup_model()
+
+
+@lru_cache(maxsize=1024)
+def query_encoding(query: str):
+    """
+    Tokenized query (no special tokens), cached across requests.
+
+    RAG pipelines rerank the same query repeatedly (retries, query rewrites
+    fanning out to the same question, paging), so the encoding is kept.
+    """
+    return model.tokenizer(query, add_special_tokens=False, truncation=True, max_length=MAX_QUERY_TOKENS).encodings[0]
+
+
+def score_batch(jobs: List[Tuple[str, List[str]]]) -> List[np.ndarray]:
+    """
+    Score the documents of several (query, documents) jobs in one run.
+
+    Equivalent to model.predict() on [query, doc] pairs, except each query is
+    tokenized once (see query_encoding) and reused for every pair. Pairs of all
+    jobs are batched together shortest first, so each batch pads to little more
+    than its longest pair. Returns one score array per job, in document order.
+    """
+    tokenizer = model.tokenizer
+    backend = tokenizer.backend_tokenizer
+    max_length = model.max_length
+    input_names = tokenizer.model_input_names
+
+    # [CLS] query [SEP] doc [SEP] (plus token types where the model uses them),
+    # assembled from the encodings by the tokenizer's own post-processor
+    features = []
+    with tokenizer_lock:
+        for query, documents in jobs:
+            query_enc = query_encoding(query)
+            doc_budget = max(0, max_length - len(query_enc.ids) - tokenizer.num_special_tokens_to_add(pair=True))
+            doc_encs = tokenizer(documents, add_special_tokens=False, truncation=True, max_length=max_length).encodings
+            for doc_enc in doc_encs:
+                doc_enc.truncate(doc_budget)
+                pair = backend.post_process(query_enc, doc_enc, add_special_tokens=True)
+                encoded = {'input_ids': pair.ids, 'token_type_ids': pair.type_ids, 'attention_mask': pair.attention_mask}
+                features.append({name: encoded[name] for name in input_names if name in encoded})
+    order = sorted(range(len(features)), key=lambda i: len(features[i]['input_ids']))
+
+    device = model.device
+    on_gpu = device.type == 'cuda'
+
+    # Scores stay on the device until all batches are queued - no per-batch
+    # sync, so padding the next batch overlaps with the previous forward pass
+    batch_scores = []
+    with torch.inference_mode():
+        for start in range(0, len(order), BATCH_SIZE):
+            batch_order = order[start:start + BATCH_SIZE]
+            batch_features = [features[i] for i in batch_order]
+            longest = len(batch_features[-1]['input_ids'])
+            bucket = next((b for b in BUCKETS if b >= longest), None)
+            if bucket:
+                batch = tokenizer.pad(batch_features, padding='max_length', max_length=bucket, return_tensors='pt')
+            else:
+                batch = tokenizer.pad(batch_features, return_tensors='pt')
+            if on_gpu:
+                # Pinned host memory makes the copy asynchronous
+                batch = {k: v.pin_memory().to(device, non_blocking=True) for k, v in batch.items()}
+            else:
+                batch = batch.to(device)
+            logits = model_forward(**batch).logits
+            # Copy out per batch - with an identity activation this would otherwise
+            # be a view of a CUDA graph output that the next replay overwrites
+            batch_scores.append((batch_order, model.activation_fn(logits).view(-1).to(torch.float32, copy=True)))
+
+    scores = np.empty(len(features), dtype=np.float32)
+    for batch_order, batch_score in batch_scores:
+        scores[batch_order] = batch_score.cpu().numpy()
+
+    # Split the flat score array back into per-job arrays
+    bounds = np.cumsum([len(documents) for _, documents in jobs])[:-1]
+    return np.split(scores, bounds)
+
+
+async def score_jobs(jobs: list, slots: asyncio.Semaphore):
+    """Score one coalesced batch on the executor and resolve its futures."""
+    try:
+        results = await asyncio.get_running_loop().run_in_executor(
+            executor, score_batch, [(query, documents) for query, documents, _ in jobs]
+        )
+    except Exception as e:
+        for _, _, future in jobs:
+            if not future.done():
+                future.set_exception(e)
+    else:
+        for (_, _, future), scores in zip(jobs, results):
+            if not future.done():
+                future.set_result(scores)
+    finally:
+        slots.release()
+
+
+async def run_batcher():
+    """
+    Coalesce concurrent rerank jobs into shared scoring runs.
+
+    Once a worker is free, takes the first pending job, then keeps collecting
+    for up to MAX_WAIT_MS or until MAX_BATCH_PAIRS pairs are pending and hands
+    them to the executor as one run. While all workers are busy, new jobs pile
+    up in the queue and join the next run.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(WORKERS)
+    running = set()
+    while True:
+        await slots.acquire()
+        jobs = [await batch_queue.get()]
+        pairs = len(jobs[0][1])
+        deadline = loop.time() + MAX_WAIT_MS / 1000
+
+        while pairs < MAX_BATCH_PAIRS:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                job = await asyncio.wait_for(batch_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            jobs.append(job)
+            pairs += len(job[1])
+
+        task = asyncio.create_task(score_jobs(jobs, slots))
+        running.add(task)
+        task.add_done_callback(running.discard)
+
+
+class ScoreCache:
+    """
+    Bounded LRU of (query, document) -> score.
+
+    Keys are 16-byte BLAKE2b digests of query and document, so entries cost
+    a few dozen bytes regardless of text length. Only touched from the event
+    loop, so no locking is needed.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[float]:
+        score = self.entries.get(key)
+        if score is not None:
+            self.entries.move_to_end(key)
+        return score
+
+    def set(self, key: bytes, score: float):
+        self.entries[key] = score
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+async def score_with_model(query: str, documents: List[str]) -> np.ndarray:
+    """Score documents against the query via the dynamic batcher."""
+    future = asyncio.get_running_loop().create_future()
+    await batch_queue.put((query, documents, future))
+    return await future
+
+
+async def score_documents(query: str, documents: List[str]) -> np.ndarray:
+    """Score documents against the query, only running the model for uncached pairs."""
+    if score_cache is None:
+        return await score_with_model(query, documents)
+
+    query_digest = ScoreCache.digest(query)
+    keys = [query_digest + ScoreCache.digest(doc) for doc in documents]
+
+    scores = np.empty(len(documents), dtype=np.float32)
+    misses = []
+    for i, key in enumerate(keys):
+        cached = score_cache.get(key)
+        if cached is None:
+            misses.append(i)
+        else:
+            scores[i] = cached
+
+    if misses:
+        miss_scores = await score_with_model(query, [documents[i] for i in misses])
+        scores[misses] = miss_scores
+        for i, score in zip(misses, miss_scores):
+            score_cache.set(keys[i], float(score))
+
+    return scores
+
 
 class RerankRequest(BaseModel):
     query: str
     documents: List[str]
     top_k: Optional[int] = None
+    # Echo document text in the results - callers usually only need index/score
+    include_documents: bool = False
+    # Return the documents as-is (score 1.0, original order) when there are
+    # no more than top_k of them, instead of running the model
+    skip_within_top_k: bool = False
+
 
 class RerankResult(BaseModel):
     index: int
     score: float
-    document: str
+    document: Optional[str] = None
+
 
 class RerankResponse(BaseModel):
     results: List[RerankResult]
     processing_time_ms: float
     model: str
+    # False when the model was skipped (skip_within_top_k)
+    reranked: bool = True
+
 
 class HealthResponse(BaseModel):
     status: str
     model: str
     ready: bool
 
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global model
-    print(f"Loading reranker model: {MODEL_NAME}")
+    """Load model on startup."""
+    global model, model_forward, batch_queue, batcher_task, executor, score_cache
+    print(f"Loading reranker model: {MODEL_NAME} (backend: {BACKEND})")
+    print(f"Profile: {MODEL_PROFILES.get(MODEL_NAME, 'custom - latency unknown')}")
+    torch.set_num_threads(INTRA_OP_THREADS)
+    torch.set_num_interop_threads(1)
+    print(f"Threads: {WORKERS} workers x {INTRA_OP_THREADS} intra-op")
     start = time.time()
-    model = CrossEncoder(MODEL_NAME, max_length=512)
+    model = load_model()
+    model_forward = model.model
     print(f"Model loaded in {time.time() - start:.2f}s")
+
+    # Warm up (and compile) on the executor that serves requests - CUDA graph
+    # trees are per thread, so graphs captured elsewhere would not be reused
+    executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="rerank")
+    warmup = compile_model if BACKEND == "torch" and COMPILE else warmup_model
+    await asyncio.get_running_loop().run_in_executor(executor, warmup)
+
+    score_cache = ScoreCache(CACHE_SIZE) if CACHE_SIZE > 0 else None
+    batch_queue = asyncio.Queue()
+    batcher_task = asyncio.create_task(run_batcher())
+
     yield
     print("Shutting down reranker service")
+    batcher_task.cancel()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(
+    title="Reranker Service",
+    description="BGE-reranker-v2-m3 for RAG reranking",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
-app = FastAPI(title="Reranker Service", version="1.0.0", lifespan=lifespan)
 
 @app.get("/health", response_model=HealthResponse)
 async def health():
-    return HealthResponse(status="ok" if model else "loading", model=MODEL_NAME, ready=model is not None)
+    """Health check endpoint."""
+    return HealthResponse(
+        status="ok" if model else "loading",
+        model=MODEL_NAME,
+        ready=model is not None
+    )
+
 
 @app.post("/rerank", response_model=RerankResponse)
 async def rerank(request: RerankRequest):
+    """
+    Rerank documents for a given query.
+
+    Returns documents sorted by relevance score (highest first).
+    """
     if not model:
         raise HTTPException(status_code=503, detail="Model not loaded")
+
     if not request.documents:
-        return RerankResponse(results=[], processing_time_ms=0, model=MODEL_NAME)
+        return RerankResponse(
+            results=[],
+            processing_time_ms=0,
+            model=MODEL_NAME
+        )
 
-    start = time.time()
-    pairs = [[request.query, doc] for doc in request.documents]
-    scores = model.predict(pairs)
+    start_ns = time.perf_counter_ns()
+    top_k = request.top_k or DEFAULT_TOP_K
+
+    # Nothing to choose between - the caller opted out of scoring in this case
+    if request.skip_within_top_k and len(request.documents) <= top_k:
+        return ORJSONResponse({
+            "results": [
+                {"index": i, "score": 1.0, "document": doc if request.include_documents else None}
+                for i, doc in enumerate(request.documents)
+            ],
+            "processing_time_ms": (time.perf_counter_ns() - start_ns) / 1e6,
+            "model": MODEL_NAME,
+            "reranked": False
+        })
+
+    # Get scores from cross-encoder (in request order)
+    scores = await score_documents(request.query, [doc[:MAX_DOC_CHARS] for doc in request.documents])
 
+    # Select the top_k in O(N), then sort only those by score descending
+    # (a plain sort when every document is returned anyway)
+    top_k = max(1, min(top_k, len(scores)))
+    negated = -scores
+    if top_k < len(scores):
+        top = np.argpartition(negated, top_k - 1)[:top_k]
+        top = top[np.argsort(negated[top], kind='stable')]
+    else:
+        top = np.argsort(negated, kind='stable')
+
+    # Results are plain dicts of trusted values - returning the ORJSONResponse
+    # directly skips FastAPI's validation; response_model stays for the schema
     results = [
-        RerankResult(index=i, score=float(scores[i]), document=doc)
-        for i, doc in enumerate(request.documents)
+        {
+            "index": i,
+            "score": score,
+            "document": request.documents[i] if request.include_documents else None
+        }
+        for i, score in zip(top.tolist(), scores[top].tolist())
     ]
-    results.sort(key=lambda x: x.score, reverse=True)
-    top_k = request.top_k or DEFAULT_TOP_K
-    results = results[:top_k]
 
-    return RerankResponse(
-        results=results,
-        processing_time_ms=round((time.time() - start) * 1000, 2),
-        model=MODEL_NAME
-    )
+    processing_time = (time.perf_counter_ns() - start_ns) / 1e6
+
+    return ORJSONResponse({
+        "results": results,
+        "processing_time_ms": processing_time,
+        "model": MODEL_NAME,
+        "reranked": True
+    })
+
 
 if __name__ == "__main__":
     import uvicorn